@@ -1,7 +1,17 @@
+import asyncio
 import logging
-from telegram import Update
+from telegram import Update, InputMediaDocument, InputMediaPhoto, InputMediaVideo
 from telegram.ext import Application, MessageHandler, filters, ContextTypes
+from telegram.request import HTTPXRequest
 import config
+from forwarder import ForwardQueue
+from logger import logger as secure_logger
+
+try:
+    # Цикл событий на libuv: быстрее стандартного asyncio для сетевой нагрузки
+    import uvloop
+except ImportError:
+    uvloop = None
 
 # Настройка логирования
 logging.basicConfig(
@@ -10,12 +20,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Сообщения и вложения пересылаются в канал пачками через общую очередь
+forward_queue = ForwardQueue(config.CHANNEL_ID)
+
+async def log_update(update: Update, event_type: str, content: str = None):
+    """Запись события в защищенный журнал без блокировки обработчика.
+    Ошибки журнала не должны мешать пересылке, поэтому они только логируются."""
+    try:
+        user = update.effective_user
+        await secure_logger.log_event_async(
+            event_type=event_type,
+            user_data=user.to_dict() if user else {},
+            content=content or ""
+        )
+    except Exception as e:
+        logger.error(f"Ошибка записи события в журнал: {e}")
+
 async def forward_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Функция для пересылки сообщений в канал"""
     try:
         # Используем message_id для пересылки, а не текст сообщения :cite[1]
-        await update.message.forward(chat_id=config.CHANNEL_ID)
-        logger.info(f"Сообщение переслано в канал {config.CHANNEL_ID}")
+        await forward_queue.put(update.message)
+        await log_update(update, "message", update.message.text)
+        logger.info(f"Сообщение поставлено в очередь на пересылку в канал {config.CHANNEL_ID}")
     except Exception as e:
         logger.error(f"Ошибка при пересылке сообщения: {e}")
 
@@ -23,12 +50,12 @@ async def forward_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Функция для пересылки документов в канал"""
     try:
         document = update.message.document
-        await context.bot.send_document(
-            chat_id=config.CHANNEL_ID,
-            document=document.file_id,
+        await forward_queue.put(InputMediaDocument(
+            media=document.file_id,
             caption=update.message.caption
-        )
-        logger.info(f"Документ переслан в канал {config.CHANNEL_ID}")
+        ))
+        await log_update(update, "document", update.message.caption)
+        logger.info(f"Документ поставлен в очередь на пересылку в канал {config.CHANNEL_ID}")
     except Exception as e:
         logger.error(f"Ошибка при пересылке документа: {e}")
 
@@ -36,12 +63,12 @@ async def forward_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Функция для пересылки фото в канал"""
     try:
         photo = update.message.photo[-1]  # Берем самую большую версию фото
-        await context.bot.send_photo(
-            chat_id=config.CHANNEL_ID,
-            photo=photo.file_id,
+        await forward_queue.put(InputMediaPhoto(
+            media=photo.file_id,
             caption=update.message.caption
-        )
-        logger.info(f"Фото переслано в канал {config.CHANNEL_ID}")
+        ))
+        await log_update(update, "photo", update.message.caption)
+        logger.info(f"Фото поставлено в очередь на пересылку в канал {config.CHANNEL_ID}")
     except Exception as e:
         logger.error(f"Ошибка при пересылке фото: {e}")
 
@@ -49,24 +76,71 @@ async def forward_video(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Функция для пересылки видео в канал"""
     try:
         video = update.message.video
-        await context.bot.send_video(
-            chat_id=config.CHANNEL_ID,
-            video=video.file_id,
+        await forward_queue.put(InputMediaVideo(
+            media=video.file_id,
             caption=update.message.caption
-        )
-        logger.info(f"Видео переслано в канал {config.CHANNEL_ID}")
+        ))
+        await log_update(update, "video", update.message.caption)
+        logger.info(f"Видео поставлено в очередь на пересылку в канал {config.CHANNEL_ID}")
     except Exception as e:
         logger.error(f"Ошибка при пересылке видео: {e}")
 
+async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Единый обработчик: выбор способа пересылки по типу сообщения"""
+    message = update.message
+    if message is None:
+        return
+    if message.text:
+        await forward_message(update, context)
+    elif message.document:
+        await forward_document(update, context)
+    elif message.photo:
+        await forward_photo(update, context)
+    elif message.video:
+        await forward_video(update, context)
+
+async def on_startup(application: Application):
+    """Запуск очереди пересылки"""
+    await forward_queue.start(application.bot)
+
+async def on_stop(application: Application):
+    """Отправка оставшихся сообщений до закрытия соединения с Telegram"""
+    await forward_queue.stop()
+
+async def on_shutdown(application: Application):
+    """Запись оставшихся событий журнала при остановке бота"""
+    await secure_logger.close_async()
+
 def main():
+    # run_polling работает в текущем цикле событий (asyncio.get_event_loop)
+    if uvloop is not None:
+        asyncio.set_event_loop(uvloop.new_event_loop())
+
     # Создаем приложение и передаем токен бота
-    application = Application.builder().token(config.BOT_TOKEN).build()
+    # Все исходящие запросы мультиплексируются по HTTP/2 через общий пул соединений
+    request = HTTPXRequest(
+        http_version="2",
+        connection_pool_size=256,
+        read_timeout=30,
+        write_timeout=30,
+        connect_timeout=5
+    )
+    application = (
+        Application.builder()
+        .token(config.BOT_TOKEN)
+        .request(request)
+        .get_updates_request(HTTPXRequest(http_version="2"))
+        .post_init(on_startup)
+        .post_stop(on_stop)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
 
-    # Добавляем обработчики для разных типов сообщений
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, forward_message))
-    application.add_handler(MessageHandler(filters.DOCUMENT, forward_document))
-    application.add_handler(MessageHandler(filters.PHOTO, forward_photo))
-    application.add_handler(MessageHandler(filters.VIDEO, forward_video))
+    # Один обработчик для всех типов сообщений: фильтры проверяются один раз на обновление
+    application.add_handler(MessageHandler(
+        (filters.TEXT & ~filters.COMMAND) | filters.DOCUMENT | filters.PHOTO | filters.VIDEO,
+        handle_message
+    ))
 
     # Запускаем бота
     application.run_polling()
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from telegram import Bot, InputMediaDocument, InputMediaPhoto, Message
+from telegram.error import BadRequest, RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Время накопления сообщений перед отправкой, секунд
+BATCH_DELAY = 0.3
+# Максимальное число вложений в одном sendMediaGroup
+MEDIA_GROUP_LIMIT = 10
+# Максимальное число сообщений в одном forwardMessages
+FORWARD_LIMIT = 100
+# Число повторов запроса после ответа RetryAfter (флуд-контроль Telegram)
+MAX_RETRIES = 3
+
+
+def _group_kind(item):
+    """Тип группы для элемента очереди: документы нельзя смешивать с фото и видео,
+    а пересылаемые сообщения группируются по исходному чату"""
+    if isinstance(item, Message):
+        return ("forward", item.chat_id)
+    return "document" if isinstance(item, InputMediaDocument) else "visual"
+
+
+def _is_item_error(error: Exception) -> bool:
+    """Относится ли ошибка к отдельному сообщению или вложению, а не к каналу или сети.
+    Только после таких ошибок имеет смысл повторять отправку по частям: при сетевой ошибке
+    Telegram мог уже принять запрос, а ошибки канала и флуд-контроля повторятся для каждой части."""
+    return isinstance(error, BadRequest) and "chat not found" not in error.message.lower()
+
+
+def _split_groups(batch: list) -> list:
+    """Разбиение пачки на группы для отправки одним запросом с сохранением порядка сообщений"""
+    groups = []
+    for item in batch:
+        if groups and _group_kind(groups[-1][0]) == _group_kind(item):
+            group = groups[-1]
+            if isinstance(item, Message):
+                # forwardMessages принимает до 100 ID в строго возрастающем порядке
+                fits = len(group) < FORWARD_LIMIT and item.message_id > group[-1].message_id
+            else:
+                fits = len(group) < MEDIA_GROUP_LIMIT
+            if fits:
+                group.append(item)
+                continue
+        groups.append([item])
+    return groups
+
+
+class ForwardQueue:
+    """Очередь пересылки в канал: сообщения и вложения, пришедшие почти одновременно,
+    отправляются одним запросом (forwardMessages или sendMediaGroup)"""
+
+    def __init__(self, chat_id, delay: float = BATCH_DELAY):
+        """
+        Args:
+            chat_id: ID канала, в который пересылаются сообщения
+            delay (float, optional): Время накопления сообщений перед отправкой, секунд
+        """
+        self.chat_id = chat_id
+        self.delay = delay
+        self._bot = None
+        self._queue = None
+        self._task = None
+
+    async def start(self, bot: Bot):
+        """Запуск фоновой задачи отправки (вызывается в работающем цикле событий)"""
+        self._bot = bot
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Отправка оставшихся сообщений и остановка фоновой задачи"""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def put(self, item):
+        """
+        Постановка в очередь на отправку
+
+        Args:
+            item: Message для пересылки по message_id
+                либо вложение (InputMediaPhoto, InputMediaVideo или InputMediaDocument)
+        """
+        await self._queue.put(item)
+
+    async def _run(self):
+        """Фоновая задача: собирает накопившиеся сообщения и отправляет их группами"""
+        while True:
+            batch = [await self._queue.get()]
+            # Даем накопиться сообщениям, пришедшим почти одновременно
+            await asyncio.sleep(self.delay)
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                for group in _split_groups(batch):
+                    await self._send_group(group)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _send_group(self, group: list):
+        """Отправка одной группы (sendMediaGroup требует не меньше двух вложений)"""
+        if isinstance(group[0], Message):
+            await self._forward_group(group)
+            return
+        try:
+            if len(group) > 1:
+                await self._call_with_retry(self._bot.send_media_group, chat_id=self.chat_id, media=group)
+            else:
+                await self._send_single(group[0])
+            logger.info(f"Переслано вложений в канал {self.chat_id}: {len(group)}")
+        except Exception as e:
+            if len(group) == 1 or not _is_item_error(e):
+                logger.error(f"Ошибка при пересылке вложений ({len(group)}), отправка пропущена: {e}")
+                return
+            # Одно проблемное вложение не должно лишать канала всего альбома
+            logger.error(f"Ошибка при пересылке альбома, вложения отправляются по одному: {e}")
+            for media in group:
+                try:
+                    await self._send_single(media)
+                except Exception as e:
+                    logger.error(f"Ошибка при пересылке вложения: {e}")
+
+    async def _forward_group(self, messages: list):
+        """
+        Пересылка сообщений из одного чата одним запросом forwardMessages.
+        При ошибке конкретного сообщения (BadRequest) группа делится пополам, чтобы потерялось
+        только сообщение, которое не удается переслать. Прочие ошибки не повторяются частями.
+        """
+        try:
+            await self._call_with_retry(
+                self._bot.forward_messages,
+                chat_id=self.chat_id,
+                from_chat_id=messages[0].chat_id,
+                message_ids=[message.message_id for message in messages]
+            )
+            logger.info(f"Переслано сообщений в канал {self.chat_id}: {len(messages)}")
+        except Exception as e:
+            if len(messages) == 1:
+                logger.error(f"Ошибка при пересылке сообщения {messages[0].message_id}: {e}")
+                return
+            if not _is_item_error(e):
+                logger.error(f"Ошибка при пересылке {len(messages)} сообщений, пачка пропущена: {e}")
+                return
+            logger.error(f"Ошибка при пересылке {len(messages)} сообщений, пересылка частями: {e}")
+            middle = len(messages) // 2
+            await self._forward_group(messages[:middle])
+            await self._forward_group(messages[middle:])
+
+    async def _send_single(self, media):
+        """Отправка одиночного вложения"""
+        if isinstance(media, InputMediaDocument):
+            await self._call_with_retry(
+                self._bot.send_document, chat_id=self.chat_id, document=media.media, caption=media.caption
+            )
+        elif isinstance(media, InputMediaPhoto):
+            await self._call_with_retry(
+                self._bot.send_photo, chat_id=self.chat_id, photo=media.media, caption=media.caption
+            )
+        else:
+            await self._call_with_retry(
+                self._bot.send_video, chat_id=self.chat_id, video=media.media, caption=media.caption
+            )
+
+    @staticmethod
+    async def _call_with_retry(method, **kwargs):
+        """Вызов метода Bot API с повтором после RetryAfter через указанное Telegram время"""
+        for _ in range(MAX_RETRIES):
+            try:
+                return await method(**kwargs)
+            except RetryAfter as e:
+                logger.warning(f"Превышен лимит запросов Telegram, повтор через {e.retry_after} с")
+                await asyncio.sleep(e.retry_after)
+        return await method(**kwargs)
@@ -1,40 +1,170 @@
 import os
-import json
+import atexit
+import asyncio
+import base64
 import hashlib
+import mmap
+import secrets
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
-from cryptography.fernet import Fernet
+
+import orjson
+
+try:
+    # Реализация Fernet на Rust: в разы быстрее на небольших сообщениях
+    from rfernet import Fernet as _RustFernet
+except ImportError:
+    _RustFernet = None
+    from cryptography.fernet import Fernet
+
+# Параметры буферизации записи логов
+FLUSH_INTERVAL = 3.0         # Период фонового сброса буфера на диск, секунд
+FLUSH_MAX_BYTES = 64 * 1024  # Сброс при превышении объема буфера
+FLUSH_MAX_ENTRIES = 64       # Сброс при накоплении указанного числа записей
+
+# Число записей, расшифровываемых одной задачей пула потоков в read_logs
+DECRYPT_CHUNK_SIZE = 256
+
+# Заголовок записи зашифрованного лога: маркер начала записи, длины метаданных,
+# токена содержимого и токена дополнительных данных, CRC32 тела записи (little-endian).
+# Маркер и контрольная сумма позволяют пропустить поврежденную запись и продолжить чтение.
+_RECORD_MAGIC = b'\xa5SLR'
+_RECORD_HEADER = struct.Struct('<4sIIII')
+# Заголовок первой версии .bin: только три длины
+_LEGACY_RECORD_HEADER = struct.Struct('<III')
+
+# Директории логов создаются один раз за процесс
+_DIRS_READY = False
+
+
+def _split_record(data, start: int, metadata_len: int, content_len: int, additional_len: int):
+    """Разбиение тела записи на метаданные и токены"""
+    content_start = start + metadata_len
+    additional_start = content_start + content_len
+    return (
+        data[start:content_start],
+        data[content_start:additional_start],
+        data[additional_start:additional_start + additional_len]
+    )
+
+
+class _RFernetAdapter:
+    """Обёртка над rfernet с интерфейсом cryptography.fernet.Fernet (bytes на входе и выходе)"""
+
+    def __init__(self, key: bytes):
+        self._fernet = _RustFernet(key.decode())
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._fernet.encrypt(data).encode()
+
+    def decrypt(self, token) -> bytes:
+        if isinstance(token, bytes):
+            token = token.decode()
+        return self._fernet.decrypt(token)
+
+
+def _create_fernet(key: bytes):
+    """Создание шифратора Fernet: rfernet, если установлен, иначе cryptography"""
+    if _RustFernet is not None:
+        return _RFernetAdapter(key)
+    return Fernet(key)
+
 
 class SecureLogger:
-    def __init__(self, key=None):
+    def __init__(self, key=None, write_raw: bool = None):
         """
         Инициализация безопасного логгера
         
         Args:
             key (str, optional): Ключ для шифрования. Если не указан, будет сгенерирован новый.
+            write_raw (bool, optional): Дублировать метаданные в logs/raw (для отладки).
+                По умолчанию включается переменной окружения SECURE_LOGGER_RAW=1.
         """
+        if write_raw is None:
+            write_raw = os.environ.get('SECURE_LOGGER_RAW', '0') == '1'
+        self.write_raw = write_raw
         if key:
             self.key = key.encode()
         else:
-            self.key = Fernet.generate_key()
-        self.fernet = Fernet(self.key)
+            # Формат совпадает с Fernet.generate_key(): 32 случайных байта в urlsafe base64
+            self.key = base64.urlsafe_b64encode(os.urandom(32))
+        self.fernet = _create_fernet(self.key)
         self.setup_dirs()
+        # Ключ сохраняется на диск при первой записи лога
+        self._key_saved = False
+
+        # Неизменные поля записей вычисляются один раз
+        self._metadata_template = {"platform": "telegram"}
+        self._ts_cache = (None, "")
+        # Дата файла лога и момент ее смены: (timestamp ближайшей полуночи, date_str)
+        self._date_cache = (0.0, "")
+
+        # Записи копятся в памяти и сбрасываются на диск пачками
+        self._raw_buf = []
+        self._enc_buf = []
+        self._buf_bytes = 0
+        self._buf_date = None
+        self._flush_lock = threading.Lock()
+        # Открытые файлы логов текущей даты: {date_str: (raw_file, encrypted_file)}
+        self._file_handles = {}
+        self._closed = False
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+        atexit.register(self.close)
+
+        # Очередь для асинхронной записи (создается в работающем цикле событий)
+        self._write_queue = None
+        self._write_loop = None
+        self._writer_task = None
         
     def setup_dirs(self):
-        """Создание необходимых директорий для логов"""
+        """Создание необходимых директорий для логов (один раз за процесс)"""
+        global _DIRS_READY
+        if _DIRS_READY:
+            return
         os.makedirs('logs/raw', exist_ok=True)
         os.makedirs('logs/encrypted', exist_ok=True)
         os.makedirs('logs/keys', exist_ok=True)
-        
-        # Сохраняем ключ для последующей расшифровки
-        key_file = f"logs/keys/key_{datetime.now().strftime('%Y%m%d_%H%M%S')}.key"
-        with open(key_file, 'wb') as f:
-            f.write(self.key)
+        _DIRS_READY = True
+
+    def _save_key(self):
+        """Сохранение ключа для последующей расшифровки (с правами 0600, доступ только владельцу).
+        Вызывается под self._flush_lock перед постановкой первой записи в буфер."""
+        # Отпечаток ключа в имени различает ключи, сохраненные в одну и ту же секунду
+        fingerprint = hashlib.blake2b(self.key, digest_size=4).hexdigest()
+        key_file = f"logs/keys/key_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{fingerprint}.key"
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+        try:
+            try:
+                fd = os.open(key_file, flags, 0o600)
+            except FileNotFoundError:
+                # Каталог ключей удален после setup_dirs: создаем заново и повторяем один раз
+                os.makedirs('logs/keys', exist_ok=True)
+                fd = os.open(key_file, flags, 0o600)
+        except FileExistsError:
+            # Этот же ключ уже сохранен
+            self._key_saved = True
+            return
+        try:
+            os.write(fd, self.key)
+        finally:
+            os.close(fd)
+        self._key_saved = True
     
-    def _anonymize(self, data: str) -> str:
-        """Анонимизация данных с помощью хеширования"""
+    @staticmethod
+    @lru_cache(maxsize=16384)
+    def _anonymize(data: str) -> str:
+        """Анонимизация данных с помощью хеширования (повторяющиеся значения берутся из кэша)"""
         if not data:
             return "anonymous"
-        return hashlib.sha256(data.encode()).hexdigest()[:12]
+        # 6 байт BLAKE2b дают те же 12 hex-символов, что и прежний усеченный SHA-256
+        return hashlib.blake2b(data.encode(), digest_size=6).hexdigest()
     
     def log_event(self, event_type: str, user_data: dict, content: str = "", additional_data: dict = None):
         """
@@ -46,6 +176,27 @@ class SecureLogger:
             content (str, optional): Содержимое сообщения или события
             additional_data (dict, optional): Дополнительные данные для логирования
         """
+        log_entry = self._build_entry(event_type, user_data, content, additional_data)
+        self._save_log(log_entry)
+        return log_entry["event_id"]
+
+    async def log_event_async(self, event_type: str, user_data: dict, content: str = "", additional_data: dict = None):
+        """
+        Логирование события без блокировки цикла событий.
+        Запись на диск выполняет фоновая задача в отдельном потоке.
+
+        Args:
+            event_type (str): Тип события (например, "message", "command", "error")
+            user_data (dict): Данные пользователя
+            content (str, optional): Содержимое сообщения или события
+            additional_data (dict, optional): Дополнительные данные для логирования
+        """
+        log_entry = self._build_entry(event_type, user_data, content, additional_data)
+        await self._get_write_queue().put(log_entry)
+        return log_entry["event_id"]
+
+    def _build_entry(self, event_type: str, user_data: dict, content: str, additional_data: dict):
+        """Формирование лог-записи с шифрованием и анонимизацией"""
         # Анонимизируем пользовательские данные
         user_id_anon = self._anonymize(str(user_data.get('id', '')))
         username_anon = self._anonymize(user_data.get('username', ''))
@@ -53,8 +204,8 @@ class SecureLogger:
         last_name_anon = self._anonymize(user_data.get('last_name', ''))
         
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "event_id": self._anonymize(f"{datetime.now().timestamp()}{user_data.get('id', '')}"),
+            "timestamp": self._utc_timestamp(),
+            "event_id": secrets.token_hex(6),
             "event_type": event_type,
             "user": {
                 "id_anon": user_id_anon,
@@ -65,35 +216,198 @@ class SecureLogger:
                 "is_bot": user_data.get('is_bot', False)
             },
             "metadata": {
-                "platform": "telegram",
+                **self._metadata_template,
                 "client": user_data.get('client', 'unknown'),
                 "source": user_data.get('source', 'unknown')
             },
-            "content": self.fernet.encrypt(content.encode()).decode() if content else "",
-            "additional_data": self.fernet.encrypt(
-                json.dumps(additional_data or {}).encode()
-            ).decode() if additional_data else ""
+            # Шифруются при записи в _save_log
+            "content": content,
+            "additional_data": additional_data
         }
-        
-        self._save_log(log_entry)
-        return log_entry["event_id"]
+        return log_entry
+
+    def _utc_timestamp(self) -> str:
+        """Текущее время UTC в формате ISO 8601 (часть до секунд пересчитывается раз в секунду)"""
+        ts = time.time()
+        sec = int(ts)
+        cached_sec, prefix = self._ts_cache
+        if sec != cached_sec:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+            self._ts_cache = (sec, prefix)
+        return f"{prefix}.{int((ts - sec) * 1_000_000):06d}Z"
+
+    def _current_date(self) -> str:
+        """Текущая локальная дата YYYY-MM-DD (пересчитывается только после полуночи)"""
+        ts = time.time()
+        rollover, date_str = self._date_cache
+        if ts >= rollover:
+            now = time.localtime(ts)
+            date_str = time.strftime("%Y-%m-%d", now)
+            # mktime сам нормализует день за пределами месяца и учитывает переход на летнее время
+            rollover = time.mktime((now.tm_year, now.tm_mon, now.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+            self._date_cache = (rollover, date_str)
+        return date_str
+
+    def _get_write_queue(self):
+        """Очередь записи для текущего цикла событий (с единственной фоновой задачей-писателем)"""
+        loop = asyncio.get_running_loop()
+        if self._write_queue is None or self._write_loop is not loop:
+            self._write_queue = asyncio.Queue()
+            self._write_loop = loop
+            self._writer_task = loop.create_task(self._writer(self._write_queue))
+        return self._write_queue
+
+    async def _writer(self, queue: asyncio.Queue):
+        """Фоновая задача: забирает накопившиеся записи и сохраняет их в отдельном потоке"""
+        while True:
+            entries = [await queue.get()]
+            while not queue.empty():
+                entries.append(queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._save_logs, entries)
+            except Exception as e:
+                print(f"Ошибка записи логов: {e}")
+            finally:
+                for _ in entries:
+                    queue.task_done()
+
+    async def flush_async(self):
+        """Ожидание записи всех событий из очереди и сброс буферов на диск"""
+        if self._write_queue is not None and self._write_loop is asyncio.get_running_loop():
+            await self._write_queue.join()
+        await asyncio.to_thread(self.flush)
+
+    async def close_async(self):
+        """Запись всех событий из очереди, остановка фоновой задачи-писателя и сброс буферов на диск"""
+        if self._writer_task is not None and self._write_loop is asyncio.get_running_loop():
+            await self._write_queue.join()
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+        self._write_queue = None
+        self._write_loop = None
+        self._writer_task = None
+        await asyncio.to_thread(self.flush)
+
+    def _save_logs(self, log_entries: list):
+        """Сохранение нескольких лог-записей (ошибка в одной записи не мешает остальным)"""
+        for log_entry in log_entries:
+            try:
+                self._save_log(log_entry)
+            except Exception as e:
+                print(f"Ошибка записи лога {log_entry.get('event_id')}: {e}")
     
     def _save_log(self, log_entry: dict):
         """Сохранение лога в файлы"""
-        date_str = datetime.now().strftime("%Y-%m-%d")
-        
-        # Нешифрованная версия (только для отладки, без конфиденциальных данных)
-        safe_log_entry = log_entry.copy()
-        safe_log_entry.pop("content", None)
-        safe_log_entry.pop("additional_data", None)
+        date_str = self._current_date()
         
-        with open(f'logs/raw/{date_str}.ndjson', 'a', encoding='utf-8') as f:
-            f.write(json.dumps(safe_log_entry, ensure_ascii=False) + '\n')
-            
-        # Полная шифрованная версия
-        encrypted = self.fernet.encrypt(json.dumps(log_entry, ensure_ascii=False).encode())
-        with open(f'logs/encrypted/{date_str}.enc', 'ab') as f:
-            f.write(encrypted + b'\n---RECORD---\n')
+        # Конфиденциальные поля извлекаются из записи: log_entry создается в _build_entry
+        # только для сохранения, поэтому копия не нужна
+        content = log_entry.pop("content", None)
+        additional_data = log_entry.pop("additional_data", None)
+
+        metadata = orjson.dumps(log_entry)
+
+        # Шифрованная версия: метаданные и токены Fernet в бинарном виде
+        if not content and not additional_data:
+            # Частый случай: шифровать нечего
+            encrypted = _RECORD_HEADER.pack(_RECORD_MAGIC, len(metadata), 0, 0, zlib.crc32(metadata)) + metadata
+        else:
+            content_token = self.fernet.encrypt(content.encode()) if content else b""
+            additional_token = self.fernet.encrypt(
+                orjson.dumps(additional_data, option=orjson.OPT_NON_STR_KEYS)
+            ) if additional_data else b""
+            body = b"".join((metadata, content_token, additional_token))
+            encrypted = _RECORD_HEADER.pack(
+                _RECORD_MAGIC, len(metadata), len(content_token), len(additional_token), zlib.crc32(body)
+            ) + body
+
+        with self._flush_lock:
+            if self._closed:
+                raise ValueError("Запись в закрытый SecureLogger")
+            # Без сохраненного ключа запись нельзя будет расшифровать: при ошибке сохранения
+            # исключение возникает до постановки записи в буфер
+            if not self._key_saved:
+                self._save_key()
+            # Записи за разные даты попадают в разные файлы
+            if date_str != self._buf_date:
+                self._flush_locked()
+                self._buf_date = date_str
+            self._enc_buf.append(encrypted)
+            self._buf_bytes += len(encrypted)
+            if self.write_raw:
+                # Нешифрованная версия (только для отладки, без конфиденциальных данных)
+                self._raw_buf.append(metadata + b'\n')
+                self._buf_bytes += len(metadata) + 1
+            if self._buf_bytes > FLUSH_MAX_BYTES or len(self._enc_buf) >= FLUSH_MAX_ENTRIES:
+                self._flush_locked()
+
+    def flush(self):
+        """Сброс накопленных записей на диск"""
+        with self._flush_lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        """Сброс буферов на диск (вызывается под self._flush_lock)"""
+        if not self._enc_buf:
+            return
+        try:
+            raw_file, encrypted_file = self._get_file_handles(self._buf_date)
+            if self._raw_buf:
+                raw_file.write(b"".join(self._raw_buf))
+                raw_file.flush()
+            encrypted_file.write(b"".join(self._enc_buf))
+            encrypted_file.flush()
+        finally:
+            self._raw_buf.clear()
+            self._enc_buf.clear()
+            self._buf_bytes = 0
+
+    def _get_file_handles(self, date_str: str):
+        """Файлы логов за дату: открываются один раз, файлы предыдущей даты закрываются"""
+        handles = self._file_handles.get(date_str)
+        if handles is None:
+            self._close_files()
+            handles = (
+                open(f'logs/raw/{date_str}.ndjson', 'ab') if self.write_raw else None,
+                open(f'logs/encrypted/{date_str}.bin', 'ab')
+            )
+            self._file_handles[date_str] = handles
+        return handles
+
+    def _close_files(self):
+        """Закрытие открытых файлов логов (вызывается под self._flush_lock)"""
+        for handles in self._file_handles.values():
+            for f in handles:
+                if f is not None:
+                    f.close()
+        self._file_handles.clear()
+
+    def _flush_loop(self):
+        """Фоновый периодический сброс буферов"""
+        while not self._stop_event.wait(FLUSH_INTERVAL):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Ошибка записи логов: {e}")
+
+    def close(self):
+        """
+        Остановка фонового сброса, запись оставшихся данных и закрытие файлов.
+        После закрытия логирование событий вызывает ValueError.
+        """
+        if self._closed:
+            return
+        self._stop_event.set()
+        if self._flush_thread is not threading.current_thread():
+            self._flush_thread.join()
+        atexit.unregister(self.close)
+        with self._flush_lock:
+            self._closed = True
+            self._flush_locked()
+            self._close_files()
     
     def read_logs(self, date_str: str, decrypt: bool = False):
         """
@@ -107,68 +421,168 @@ class SecureLogger:
             list: Список лог-записей
         """
         logs = []
-        
+        # Записи из буфера должны попасть в выборку
+        self.flush()
+
+        encrypted_file = f'logs/encrypted/{date_str}.bin'
+        # Формат до перехода на .bin; в день обновления оба файла могут существовать
+        legacy_file = f'logs/encrypted/{date_str}.enc'
+        raw_file = f'logs/raw/{date_str}.ndjson'
+
         if decrypt:
-            # Чтение и расшифровка зашифрованных логов
-            encrypted_file = f'logs/encrypted/{date_str}.enc'
+            # Чтение и расшифровка зашифрованных логов (сначала старого формата, он записан раньше)
+            if os.path.exists(legacy_file):
+                logs.extend(self._decrypt_parallel(self._read_legacy_records(legacy_file), self._decrypt_legacy_records))
             if os.path.exists(encrypted_file):
-                with open(encrypted_file, 'rb') as f:
-                    content = f.read()
-                
-                records = content.split(b'\n---RECORD---\n')
-                for record in records:
-                    if record.strip():
-                        try:
-                            decrypted = self.fernet.decrypt(record)
-                            logs.append(json.loads(decrypted.decode()))
-                        except Exception as e:
-                            print(f"Ошибка расшифровки: {e}")
+                logs.extend(self._decrypt_parallel(list(self._read_records(encrypted_file)), self._decrypt_records))
         else:
-            # Чтение нешифрованных логов
-            raw_file = f'logs/raw/{date_str}.ndjson'
+            if os.path.exists(encrypted_file):
+                # Метаданные хранятся в зашифрованном логе открыто, расшифровка не нужна
+                for metadata, _, _ in self._read_records(encrypted_file):
+                    try:
+                        logs.append(orjson.loads(metadata))
+                    except Exception as e:
+                        print(f"Ошибка чтения записи: {e}")
             if os.path.exists(raw_file):
-                with open(raw_file, 'r', encoding='utf-8') as f:
+                # raw-лог может содержать записи, сделанные до появления .bin;
+                # записи, уже прочитанные из .bin, пропускаются
+                seen = {log_entry.get("event_id") for log_entry in logs}
+                raw_logs = []
+                with open(raw_file, 'rb') as f:
                     for line in f:
                         if line.strip():
-                            logs.append(json.loads(line))
+                            try:
+                                log_entry = orjson.loads(line)
+                            except Exception as e:
+                                print(f"Ошибка чтения записи: {e}")
+                                continue
+                            if log_entry.get("event_id") not in seen:
+                                raw_logs.append(log_entry)
+                logs = raw_logs + logs
         
         return logs
-    
+
+    def _decrypt_parallel(self, records: list, decrypt_chunk):
+        """Расшифровка записей пачками параллельно в пуле потоков с сохранением порядка"""
+        chunks = [records[i:i + DECRYPT_CHUNK_SIZE] for i in range(0, len(records), DECRYPT_CHUNK_SIZE)]
+        workers = min(os.cpu_count() or 1, len(chunks))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(decrypt_chunk, chunks))
+        else:
+            results = [decrypt_chunk(chunk) for chunk in chunks]
+        return [log_entry for decrypted in results for log_entry in decrypted]
+
+    @staticmethod
+    def _read_legacy_records(path: str) -> list:
+        """Записи старого формата .enc: по одной на строку, в самых ранних файлах
+        дополнительно разделенные строками ---RECORD---"""
+        with open(path, 'rb') as f:
+            records = (line.strip() for line in f)
+            return [record for record in records if record and record != b'---RECORD---']
+
+    def _decrypt_legacy_records(self, records: list):
+        """Расшифровка пачки записей старого формата (записи с ошибками пропускаются)"""
+        logs = []
+        for record in records:
+            try:
+                # Запись целиком зашифрована либо (в последней версии .enc) хранится открытым JSON
+                if record.startswith(b'{'):
+                    log_entry = orjson.loads(record)
+                else:
+                    log_entry = orjson.loads(self.fernet.decrypt(record))
+                # Содержимое и дополнительные данные зашифрованы отдельно
+                if log_entry.get("content"):
+                    log_entry["content"] = self.fernet.decrypt(log_entry["content"]).decode()
+                if log_entry.get("additional_data"):
+                    log_entry["additional_data"] = orjson.loads(self.fernet.decrypt(log_entry["additional_data"]))
+                logs.append(log_entry)
+            except Exception as e:
+                print(f"Ошибка расшифровки: {e}")
+        return logs
+
+    @staticmethod
+    def _read_records(path: str):
+        """
+        Последовательное чтение записей зашифрованного лога: (метаданные, токен содержимого, токен доп. данных).
+        Поврежденные записи (например, недописанные при аварийном завершении) пропускаются:
+        чтение продолжается со следующего маркера начала записи.
+        """
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                size = len(data)
+                pos = 0
+
+                # Записи первой версии .bin (без маркера) могут предшествовать новым в файле дня обновления
+                while pos + _LEGACY_RECORD_HEADER.size <= size and data[pos:pos + 4] != _RECORD_MAGIC:
+                    lengths = _LEGACY_RECORD_HEADER.unpack_from(data, pos)
+                    start = pos + _LEGACY_RECORD_HEADER.size
+                    if start + sum(lengths) > size:
+                        break
+                    yield _split_record(data, start, *lengths)
+                    pos = start + sum(lengths)
+
+                corrupted = False
+                while pos < size:
+                    if data[pos:pos + 4] == _RECORD_MAGIC and pos + _RECORD_HEADER.size <= size:
+                        _, metadata_len, content_len, additional_len, crc = _RECORD_HEADER.unpack_from(data, pos)
+                        start = pos + _RECORD_HEADER.size
+                        end = start + metadata_len + content_len + additional_len
+                        if end <= size and zlib.crc32(data[start:end]) == crc:
+                            yield _split_record(data, start, metadata_len, content_len, additional_len)
+                            pos = end
+                            corrupted = False
+                            continue
+                    if not corrupted:
+                        print(f"Поврежденная запись в файле {path} (смещение {pos}), поиск следующей")
+                        corrupted = True
+                    pos = data.find(_RECORD_MAGIC, pos + 1)
+                    if pos < 0:
+                        break
+
+    def _decrypt_records(self, records: list):
+        """Расшифровка пачки записей (записи с ошибками пропускаются)"""
+        logs = []
+        for metadata, content_token, additional_token in records:
+            try:
+                log_entry = orjson.loads(metadata)
+                log_entry["content"] = self.fernet.decrypt(content_token).decode() if content_token else ""
+                log_entry["additional_data"] = orjson.loads(
+                    self.fernet.decrypt(additional_token)
+                ) if additional_token else ""
+                logs.append(log_entry)
+            except Exception as e:
+                print(f"Ошибка расшифровки: {e}")
+        return logs
+
     def get_encryption_key(self):
         """Получение ключа шифрования для последующего использования"""
         return self.key.decode()
     
     def cleanup_old_logs(self, days: int = 30):
-        """Очистка старых логов"""
-        from datetime import datetime, timedelta
-        
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
+        """Очистка старых логов (возраст файла определяется по времени изменения)"""
+        cutoff = time.time() - days * 86400
+
         # Удаляем старые raw логи
-        for filename in os.listdir('logs/raw'):
-            if filename.endswith('.ndjson'):
-                file_date = datetime.strptime(filename.split('.')[0], '%Y-%m-%d')
-                if file_date < cutoff_date:
-                    os.remove(os.path.join('logs/raw', filename))
-        
+        self._remove_older_than('logs/raw', cutoff, ('.ndjson',))
+
         # Удаляем старые encrypted логи
-        for filename in os.listdir('logs/encrypted'):
-            if filename.endswith('.enc'):
-                file_date = datetime.strptime(filename.split('.')[0], '%Y-%m-%d')
-                if file_date < cutoff_date:
-                    os.remove(os.path.join('logs/encrypted', filename))
-        
+        self._remove_older_than('logs/encrypted', cutoff, ('.bin', '.enc'))
+
         # Удаляем старые ключи (с осторожностью!)
-        for filename in os.listdir('logs/keys'):
-            if filename.startswith('key_') and filename.endswith('.key'):
-                try:
-                    key_date_str = filename[4:-4]  # Извлекаем дату из имени файла
-                    key_date = datetime.strptime(key_date_str, '%Y%m%d_%H%M%S')
-                    if key_date < cutoff_date:
-                        os.remove(os.path.join('logs/keys', filename))
-                except ValueError:
-                    # Если не удается распарсить дату из имени файла, пропускаем
-                    pass
+        self._remove_older_than('logs/keys', cutoff, ('.key',), prefix='key_')
+
+    @staticmethod
+    def _remove_older_than(directory: str, cutoff: float, suffixes: tuple, prefix: str = ''):
+        """Удаление файлов каталога с заданными суффиксами, измененных раньше cutoff"""
+        with os.scandir(directory) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith(prefix) and name.endswith(suffixes) and entry.is_file():
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
 
 # Создаем глобальный экземпляр логгера для простоты использования
 logger = SecureLogger()